@@ -0,0 +1,113 @@
+"""
+_indicators_njit.py
+
+Indicator kernels used by scanner.py: EMA, RSI and ADX, latest value only.
+_indicators_batch runs all four over every row of [tickers, bars] arrays in
+one call; rows are right-aligned and counts[i] gives row i's bar count.
+
+These are sequential recursions, so they are written as plain loops and
+compiled with numba (listed in requirements.txt). If numba is not installed
+the same functions still run, as ordinary Python. Seeding follows TA-Lib (SMA-seeded EMA / RSI,
+Wilder-sum ADX), so results match talib.EMA / RSI / ADX.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # fall back to plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, fastmath=True)
+def _ema(x, n):
+    """
+    Latest EMA of x, seeded with the SMA of the first n values
+    """
+    alpha = 2.0 / (n + 1)
+    e = 0.0
+    for i in range(n):
+        e += x[i]
+    e /= n
+    for i in range(n, x.shape[0]):
+        e += alpha * (x[i] - e)
+    return e
+
+
+@njit(cache=True, fastmath=True)
+def _rsi(close, n):
+    """
+    Latest RSI of close with Wilder-smoothed average gain / loss
+    """
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, close.shape[0]):
+        d = close[i] - close[i - 1]
+        g = d if d > 0 else 0.0
+        l = -d if d < 0 else 0.0
+        if i <= n:
+            gain += g / n
+            loss += l / n
+        else:
+            gain += (g - gain) / n
+            loss += (l - loss) / n
+    if gain + loss == 0:
+        return 0.0
+    return 100.0 * gain / (gain + loss)
+
+
+@njit(cache=True, fastmath=True)
+def _adx(high, low, close, n):
+    """
+    Latest ADX. True range and directional movement are Wilder running sums
+    seeded over the first n-1 bars; ADX is the Wilder average of DX.
+    """
+    tr_s = 0.0
+    pdm_s = 0.0
+    mdm_s = 0.0
+    adx = 0.0
+    for i in range(1, close.shape[0]):
+        up = high[i] - high[i - 1]
+        down = low[i - 1] - low[i]
+        pdm = up if (up > down and up > 0) else 0.0
+        mdm = down if (down > up and down > 0) else 0.0
+        tr = max(high[i], close[i - 1]) - min(low[i], close[i - 1])
+        if i < n:
+            tr_s += tr
+            pdm_s += pdm
+            mdm_s += mdm
+            continue
+        tr_s += tr - tr_s / n
+        pdm_s += pdm - pdm_s / n
+        mdm_s += mdm - mdm_s / n
+
+        dx = 0.0
+        if tr_s > 0 and pdm_s + mdm_s > 0:
+            dx = 100.0 * abs(pdm_s - mdm_s) / (pdm_s + mdm_s)
+        k = i - n
+        if k < n:
+            adx += dx / n
+        else:
+            adx += (dx - adx) / n
+    return adx
+
+
+@njit(cache=True, fastmath=True)
+def _indicators_batch(highs, lows, closes, counts):
+    """
+    Latest EMA20, EMA50, RSI14 and ADX14 for every row in one dispatch.
+    Returns a (rows, 4) array.
+    """
+    width = closes.shape[1]
+    out = np.empty((closes.shape[0], 4))
+    for i in range(closes.shape[0]):
+        start = width - counts[i]
+        c = closes[i, start:]
+        out[i, 0] = _ema(c, 20)
+        out[i, 1] = _ema(c, 50)
+        out[i, 2] = _rsi(c, 14)
+        out[i, 3] = _adx(highs[i, start:], lows[i, start:], c, 14)
+    return out
@@ -1,97 +1,229 @@
 import numpy as np
-import yfinance as yf
 import pandas as pd
-import pandas_ta as ta
 import datetime as dt
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from tabulate import tabulate
+from yf_cache import download, ticker_frame, MAX_CONNECTIONS, CACHE_EXPIRE
+from _indicators_njit import _ema, _rsi, _adx, _indicators_batch
+
+try:
+    import talib
+except ImportError:  # TA-Lib is optional; _indicators_njit gives the same values
+    talib = None
+
+# Rows shown per table in display_scan_results (the returned lists are complete)
+MAX_DISPLAY_ROWS = 20
+
+# Scan results per ticker, kept as long as the yf_cache download they came
+# from (CACHE_EXPIRE seconds); least recently used entries are evicted past
+# INDICATOR_CACHE_SIZE. Failures (None) are never stored. Callers get copies.
+INDICATOR_CACHE_SIZE = 512
+_indicator_cache = OrderedDict()
+_indicator_cache_lock = threading.Lock()
+
+def _cache_get(ticker):
+    with _indicator_cache_lock:
+        entry = _indicator_cache.get(ticker)
+        if entry is None:
+            return None
+        stored, result = entry
+        if time.time() - stored >= CACHE_EXPIRE:
+            del _indicator_cache[ticker]
+            return None
+        _indicator_cache.move_to_end(ticker)
+    return dict(result)
+
+
+def _cache_put(ticker, result):
+    with _indicator_cache_lock:
+        _indicator_cache[ticker] = (time.time(), dict(result))
+        _indicator_cache.move_to_end(ticker)
+        while len(_indicator_cache) > INDICATOR_CACHE_SIZE:
+            _indicator_cache.popitem(last=False)
+
+
+def _compute_last(close, high, low):
+    """
+    Latest EMA20, EMA50, RSI14 and ADX14 from float64 price arrays
+    """
+    if talib is not None:
+        return (talib.EMA(close, 20)[-1], talib.EMA(close, 50)[-1],
+                talib.RSI(close, 14)[-1], talib.ADX(high, low, close, 14)[-1])
+    return _ema(close, 20), _ema(close, 50), _rsi(close, 14), _adx(high, low, close, 14)
+
+
+def _ohlcv(DF):
+    """
+    Open, High, Low, Close, Volume of a frame as contiguous float64 rows
+    """
+    return np.ascontiguousarray(DF[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64).T)
+
+
+def _compute_batch(arrays):
+    """
+    Latest EMA20, EMA50, RSI14 and ADX14 for a list of _ohlcv arrays in one pass.
+    Returns a (len(arrays), 4) array. Tickers can have different bar counts,
+    so rows are right-aligned in the [tickers, bars] arrays.
+    """
+    counts = np.array([arr.shape[1] for arr in arrays], dtype=np.int64)
+    width = counts.max()
+    closes = np.zeros((len(arrays), width))
+    highs = np.zeros((len(arrays), width))
+    lows = np.zeros((len(arrays), width))
+    for i, arr in enumerate(arrays):
+        highs[i, width - counts[i]:] = arr[1]
+        lows[i, width - counts[i]:] = arr[2]
+        closes[i, width - counts[i]:] = arr[3]
+    
+    return _indicators_batch(highs, lows, closes, counts)
+
 
 def get_latest_indicators(ticker):
     """
     Get latest technical indicators for a stock
     Returns current RSI, EMA status, ADX and price info
+    Results are memoized per (ticker, day); failures are not cached
     """
+    cached = _cache_get(ticker)
+    if cached is not None:
+        return cached
+    
     try:
-        # Get last 60 days of data to calculate indicators
-        end_date = dt.datetime.now()
-        start_date = end_date - dt.timedelta(days=90)
-        
-        data = yf.Ticker(ticker).history(start=start_date, end=end_date, interval="1d")
+        # Get last 90 days of data to calculate indicators
+        data = ticker_frame(download([ticker], retries=0, period="90d", interval="1d", auto_adjust=True), ticker)
         if data is None or len(data) == 0:
             return None
         
-        DF = pd.DataFrame(data)
-        DF = DF.dropna()
+        result = compute_indicators(ticker, data)
+        if result:
+            _cache_put(ticker, result)
+        return result
+    
+    except Exception as e:
+        print(f"Error processing {ticker}: {str(e)}")
+        return None
+
+
+def compute_indicators(ticker, data):
+    """
+    Compute latest technical indicators from a daily OHLCV DataFrame
+    Returns current RSI, EMA status, ADX and price info
+    """
+    try:
+        DF = data.dropna()
         
         if len(DF) < 50:
             return None
         
-        # Calculate indicators using pandas_ta
-        DF.ta.ema(length=20, append=True, col_names=('EMA_20',))
-        DF.ta.ema(length=50, append=True, col_names=('EMA_50',))
-        DF.ta.rsi(length=14, append=True, col_names=('RSI',))
-        DF.ta.adx(length=14, append=True)
-        
-        # Rename ADX column if needed (pandas_ta uses 'ADX_14')
-        if 'ADX_14' in DF.columns:
-            DF['ADX'] = DF['ADX_14']
-        
-        # Get latest values
-        latest = DF.iloc[-1]
-        prev = DF.iloc[-2]
-        
-        # Calculate additional metrics
-        price_change_pct = ((latest['Close'] - prev['Close']) / prev['Close']) * 100
-        volume_ratio = latest['Volume'] / DF['Volume'].tail(20).mean() if DF['Volume'].tail(20).mean() > 0 else 0
+        # Calculate indicators in one numpy pass (only the last bar is used)
+        ohlcv = _ohlcv(DF)
+        ema20, ema50, rsi, adx = _compute_last(ohlcv[3], ohlcv[1], ohlcv[2])
         
-        # Trading signals
-        is_uptrend = latest['RSI'] > 50
-        ema_bullish = latest['EMA_20'] > latest['EMA_50']
-        strong_trend = latest['ADX'] > 25
-        
-        # Overall signal
-        signal_score = sum([is_uptrend, ema_bullish, strong_trend])
-        
-        if signal_score >= 2 and is_uptrend:
-            signal = "BUY"
-        elif signal_score >= 2:
-            signal = "WATCH"
-        else:
-            signal = "SKIP"
-        
-        return {
-            'ticker': ticker,
-            'current_price': latest['Close'],
-            'open_price': latest['Open'],
-            'high': latest['High'],
-            'low': latest['Low'],
-            'price_change_pct': price_change_pct,
-            'volume_ratio': volume_ratio,
-            'rsi': latest['RSI'],
-            'ema_20': latest['EMA_20'],
-            'ema_50': latest['EMA_50'],
-            'adx': latest['ADX'],
-            'is_uptrend': is_uptrend,
-            'ema_bullish': ema_bullish,
-            'strong_trend': strong_trend,
-            'signal': signal,
-            'signal_score': signal_score
-        }
+        return _signal_row(ticker, ohlcv, ema20, ema50, rsi, adx)
     
     except Exception as e:
         print(f"Error processing {ticker}: {str(e)}")
         return None
 
 
+def _signal_row(ticker, ohlcv, ema20, ema50, rsi, adx):
+    """
+    Build the scan result for one ticker from its _ohlcv arrays and latest indicators
+    """
+    O, H, L, C, V = ohlcv
+    
+    # Calculate additional metrics
+    price_change_pct = ((C[-1] - C[-2]) / C[-2]) * 100
+    vol_mean = V[-20:].mean()
+    volume_ratio = V[-1] / vol_mean if vol_mean > 0 else 0.0
+    
+    # Trading signals
+    is_uptrend = rsi > 50
+    ema_bullish = ema20 > ema50
+    strong_trend = adx > 25
+    
+    # Overall signal
+    signal_score = sum([is_uptrend, ema_bullish, strong_trend])
+    
+    if signal_score >= 2 and is_uptrend:
+        signal = "BUY"
+    elif signal_score >= 2:
+        signal = "WATCH"
+    else:
+        signal = "SKIP"
+    
+    return {
+        'ticker': ticker,
+        'current_price': C[-1],
+        'open_price': O[-1],
+        'high': H[-1],
+        'low': L[-1],
+        'price_change_pct': price_change_pct,
+        'volume_ratio': volume_ratio,
+        'rsi': rsi,
+        'ema_20': ema20,
+        'ema_50': ema50,
+        'adx': adx,
+        'is_uptrend': is_uptrend,
+        'ema_bullish': ema_bullish,
+        'strong_trend': strong_trend,
+        'signal': signal,
+        'signal_score': signal_score
+    }
+
+
 def scan_stocks(stock_list):
     """
     Scan multiple stocks and return trading candidates
     """
     results = []
     
+    # Tickers already scanned today come from the memo
+    pending = []
     for ticker in stock_list:
-        data = get_latest_indicators(ticker)
-        if data:
-            results.append(data)
+        cached = _cache_get(ticker)
+        if cached is not None:
+            results.append(cached)
+        else:
+            pending.append(ticker)
+    if not pending:
+        return results
+    
+    # One batched request for every ticker instead of a round-trip each
+    df_all = download(pending, period="90d", interval="1d", auto_adjust=True)
+    
+    arrays = {}
+    missing = []
+    for ticker in pending:
+        df = ticker_frame(df_all, ticker)
+        if df is None or len(df) == 0:
+            missing.append(ticker)
+        elif len(df) >= 50:
+            try:
+                arrays[ticker] = _ohlcv(df)
+            except Exception as e:
+                print(f"Error processing {ticker}: {str(e)}")
+    
+    # Indicators for every ticker in one vectorized pass
+    if arrays:
+        latest = _compute_batch(list(arrays.values()))
+        for (ticker, ohlcv), (ema20, ema50, rsi, adx) in zip(arrays.items(), latest):
+            try:
+                row = _signal_row(ticker, ohlcv, ema20, ema50, rsi, adx)
+            except Exception as e:
+                print(f"Error processing {ticker}: {str(e)}")
+                continue
+            _cache_put(ticker, row)
+            results.append(row)
+    
+    # yf.download leaves failed tickers empty; retry those individually in parallel.
+    # If the whole batch came back empty (e.g. Yahoo throttling) don't fan out.
+    if missing and df_all is not None and not df_all.empty:
+        with ThreadPoolExecutor(max_workers=min(MAX_CONNECTIONS, len(missing))) as ex:
+            results.extend(r for r in ex.map(get_latest_indicators, missing) if r)
     
     return results
 
@@ -111,39 +243,35 @@ def display_scan_results(results):
     if buy_signals:
         print("\n BUY SIGNALS")
         
-        table_data = []
-        for r in sorted(buy_signals, key=lambda x: x['rsi'], reverse=True):
-            table_data.append([
-                r['ticker'],
-                f"{r['current_price']:.2f}",
-                f"{r['price_change_pct']:+.2f}%",
-                f"{r['rsi']:.1f}",
-                f"{r['adx']:.1f}",
-                "Bull" if r['ema_bullish'] else "Bear",
-                f"{r['volume_ratio']:.2f}x",
-                r['signal_score']
-            ])
-        
-        headers = ["Ticker", "Price", "Change%", "RSI", "ADX", "EMA", "Volume", "Score"]
-        print(tabulate(table_data, headers=headers, tablefmt="simple"))
+        df = pd.DataFrame(buy_signals).nlargest(MAX_DISPLAY_ROWS, 'rsi')
+        table = pd.DataFrame({
+            "Ticker": df['ticker'],
+            "Price": df['current_price'],
+            "Change%": df['price_change_pct'].map('{:+.2f}%'.format),
+            "RSI": df['rsi'],
+            "ADX": df['adx'],
+            "EMA": np.where(df['ema_bullish'], "Bull", "Bear"),
+            "Volume": df['volume_ratio'].map('{:.2f}x'.format),
+            "Score": df['signal_score'],
+        })
+        print(tabulate(table.values.tolist(), headers=list(table.columns), tablefmt="simple",
+                       floatfmt=("", ".2f", "", ".1f", ".1f", "", "", "")))
     
     # WATCH Signals
     if watch_signals:
         print("\n WATCH LIST")
         
-        table_data = []
-        for r in sorted(watch_signals, key=lambda x: x['signal_score'], reverse=True):
-            table_data.append([
-                r['ticker'],
-                f"{r['current_price']:.2f}",
-                f"{r['rsi']:.1f}",
-                f"{r['adx']:.1f}",
-                "Bull" if r['ema_bullish'] else "Bear",
-                r['signal_score']
-            ])
-        
-        headers = ["Ticker", "Price", "RSI", "ADX", "EMA", "Score"]
-        print(tabulate(table_data, headers=headers, tablefmt="simple"))
+        df = pd.DataFrame(watch_signals).nlargest(MAX_DISPLAY_ROWS, 'signal_score')
+        table = pd.DataFrame({
+            "Ticker": df['ticker'],
+            "Price": df['current_price'],
+            "RSI": df['rsi'],
+            "ADX": df['adx'],
+            "EMA": np.where(df['ema_bullish'], "Bull", "Bear"),
+            "Score": df['signal_score'],
+        })
+        print(tabulate(table.values.tolist(), headers=list(table.columns), tablefmt="simple",
+                       floatfmt=("", ".2f", ".1f", ".1f", "", "")))
     
     return buy_signals, watch_signals
 
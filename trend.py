@@ -13,11 +13,12 @@ Notes:
 - Run this script before NSE open (e.g. 08:45 - 09:15 IST) to create your intraday watchlist.
 """
 
-import requests
-import yfinance as yf
-import pandas as pd
-from bs4 import BeautifulSoup
+import re
+import asyncio
+import httpx
+import numpy as np
 from datetime import datetime, timezone, timedelta
+from yf_cache import download, ticker_frame
 
 # ---------------------------
 # Config / symbols
@@ -27,11 +28,19 @@ ASIA_SYMBOLS = {"Nikkei": "^N225", "HangSeng": "^HSI"}  # proxies
 INDIA_VIX = "^INDIAVIX"  # India VIX on Yahoo
 # For gift/sgx nifty we will scrape a public page (moneycontrol/groww) as fallback
 GIFT_NIFTY_URL = "https://www.moneycontrol.com/live-index/gift-nifty"
+# first index-sized decimal (4+ integer digits) after a "GIFT Nifty" / "Gift-Nifty" label in
+# the raw page bytes; whole tags and small numbers such as "-0.25%" in between are skipped
+_GIFT_RE = re.compile(rb'GIFT[\s_-]*Nifty(?:<[^>]*>|[^<]){0,200}?(?<![\d.,])(\d[\d,]{3,}\.\d+)', re.IGNORECASE)
 
 # Pre-open snapshot / preopen F&O - community endpoint (used by some GitHub scripts)
 # This is a known community URL that many use to get pre-open snapshot for F&O movers.
 PREOPEN_FO_URL = "https://howutrade.in/snapdata/?data=PreOpen_FO"
 
+# Retry throttled / failing scrapes with exponential backoff
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.3  # seconds, doubled on each retry
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
 # Stocks we consider (you can expand)
 # Default to top F&O names or NIFTY50 — here example list (use real list for live)
 DEFAULT_STOCK_POOL = [
@@ -52,66 +61,71 @@ def pct_change(curr, prev):
     except Exception:
         return None
 
+def last_two_closes(hist):
+    """
+    (previous close, latest close) as floats; both are the latest close if only one bar.
+    Reads the Close column as a numpy array once instead of two .iloc lookups.
+    """
+    c = hist['Close'].to_numpy()
+    return float(c[-2] if c.size >= 2 else c[-1]), float(c[-1])
+
 def fetch_yf_symbols(symbols: dict):
     out = {}
+    # single batched download for all symbols
+    data = download(symbols.values(), period="2d", auto_adjust=True)
     for name, sym in symbols.items():
-        ticker = yf.Ticker(sym)
-        hist = ticker.history(period="2d")  # get last 2 days
-        if hist.empty:
+        hist = ticker_frame(data, sym)
+        if hist is None or hist.empty:
             out[name] = None
             continue
         # use last close and latest price if market open
-        last_close = hist['Close'].iloc[-2] if len(hist) >= 2 else hist['Close'].iloc[-1]
-        latest = hist['Close'].iloc[-1]
-        out[name] = {"symbol": sym, "last_close": float(last_close), "latest": float(latest),
-                     "pct": pct_change(float(latest), float(last_close))}
+        last_close, latest = last_two_closes(hist)
+        out[name] = {"symbol": sym, "last_close": last_close, "latest": latest,
+                     "pct": pct_change(latest, last_close)}
     return out
 
 def fetch_india_vix():
-    t = yf.Ticker(INDIA_VIX)
-    hist = t.history(period="2d")
-    if hist.empty:
+    hist = ticker_frame(download([INDIA_VIX], period="2d", auto_adjust=True), INDIA_VIX)
+    if hist is None or hist.empty:
         return None
-    last_close = hist['Close'].iloc[-2] if len(hist) >= 2 else hist['Close'].iloc[-1]
-    latest = hist['Close'].iloc[-1]
-    return {"symbol": INDIA_VIX, "last_close": float(last_close), "latest": float(latest),
-            "pct": pct_change(float(latest), float(last_close))}
+    last_close, latest = last_two_closes(hist)
+    return {"symbol": INDIA_VIX, "last_close": last_close, "latest": latest,
+            "pct": pct_change(latest, last_close)}
+
+async def _get(client, url, timeout):
+    """
+    GET that backs off and retries on 429 / 5xx responses.
+    Connection errors are retried by the client's transport.
+    """
+    for attempt in range(HTTP_RETRIES + 1):
+        r = await client.get(url, timeout=timeout)
+        if r.status_code not in RETRY_STATUS or attempt == HTTP_RETRIES:
+            return r
+        await asyncio.sleep(HTTP_BACKOFF * 2 ** attempt)
 
-def scrape_gift_nifty():
+async def scrape_gift_nifty(client):
     """
     Quick scraper for Gift Nifty from moneycontrol page. This is a fallback quick indicator.
     Replace with official API if available.
     """
     try:
-        r = requests.get(GIFT_NIFTY_URL, timeout=8)
-        soup = BeautifulSoup(r.text, "lxml")
-        # Moneycontrol page contains a numeric value; selectors may change. We try robust parsing.
-        # Look for an element containing 'Gift Nifty' or 'GIFT NIFTY' and a numeric sibling.
-        text = soup.get_text(separator="|")
-        # find first occurrence of "gift-nifty" or "GIFT" phrase - fallback: search for numeric groups
-        import re
-        # find numbers like 259xx or with commas
-        nums = re.findall(r"\b\d{2,3}[,\d]*\.\d+|\b\d{4,6}\b", text.replace(',', ''))
-        if nums:
-            # pick the first reasonable large number (likely the index)
-            for n in nums:
-                try:
-                    val = float(n)
-                    if val > 1000:  # simple filter
-                        return {"value": val}
-                except:
-                    continue
+        r = await _get(client, GIFT_NIFTY_URL, timeout=8)
+        # No DOM needed for one number: regex straight over the response bytes.
+        for m in _GIFT_RE.finditer(r.content):
+            val = float(m.group(1).replace(b',', b''))
+            if val > 1000:  # simple filter
+                return {"value": val}
         return None
     except Exception as e:
         return None
 
-def fetch_preopen_fo():
+async def fetch_preopen_fo(client):
     """
     Fetch pre-open F&O snapshot from community endpoint.
     Response is usually JSON. If unavailable, return None.
     """
     try:
-        r = requests.get(PREOPEN_FO_URL, timeout=6)
+        r = await _get(client, PREOPEN_FO_URL, timeout=6)
         if r.status_code != 200:
             return None
         data = r.json()
@@ -120,6 +134,15 @@ def fetch_preopen_fo():
     except Exception:
         return None
 
+async def fetch_external():
+    """
+    Fetch GIFT Nifty and the pre-open F&O snapshot concurrently.
+    Both requests share one HTTP/2 client; returns (gift, preopen).
+    """
+    transport = httpx.AsyncHTTPTransport(http2=True, retries=HTTP_RETRIES)
+    async with httpx.AsyncClient(transport=transport, follow_redirects=True) as client:
+        return await asyncio.gather(scrape_gift_nifty(client), fetch_preopen_fo(client))
+
 # ---------------------------
 # Scoring logic
 # ---------------------------
@@ -213,14 +236,14 @@ def analyze_preopen_and_pick_stocks(preopen_data, pool = DEFAULT_STOCK_POOL, top
             candidates.append(rowscore)
     # if candidates empty -> fallback to checking pool overnight gaps via yfinance
     if not candidates:
+        # one batched download for the whole pool
+        data = download(pool, period="2d", auto_adjust=True)
         for s in pool:
             try:
-                t = yf.Ticker(s)
-                hist = t.history(period="2d")
-                if hist.shape[0] < 2:
+                hist = ticker_frame(data, s)
+                if hist is None or hist.shape[0] < 2:
                     continue
-                prev = float(hist['Close'].iloc[-2])
-                latest = float(hist['Close'].iloc[-1])
+                prev, latest = last_two_closes(hist)
                 gap = pct_change(latest, prev)
                 candidates.append({
                     "symbol": s.replace(".NS", ""),
@@ -233,21 +256,31 @@ def analyze_preopen_and_pick_stocks(preopen_data, pool = DEFAULT_STOCK_POOL, top
                 continue
 
     # rank candidates: primary by absolute gap% and qty (if present)
-    df = pd.DataFrame(candidates)
-    if df.empty:
+    if not candidates:
         return []
+    n = len(candidates)
+    gap = np.fromiter((np.nan if c['gap_pct'] is None else c['gap_pct'] for c in candidates), np.float64, n)
+    qty = np.fromiter((np.nan if c['qty'] is None else c['qty'] for c in candidates), np.float64, n)
     # scoring heuristic
-    df['abs_gap'] = df['gap_pct'].abs()
+    abs_gap = np.abs(gap)
     # qty normalization
-    if df['qty'].notnull().any():
-        df['qty_norm'] = (df['qty'] - df['qty'].min()) / (df['qty'].max() - df['qty'].min() + 1e-9)
+    if (~np.isnan(qty)).any():
+        qty_norm = (qty - np.nanmin(qty)) / (np.nanmax(qty) - np.nanmin(qty) + 1e-9)
     else:
-        df['qty_norm'] = 0.0
+        qty_norm = np.zeros(n)
     # final score: gap magnitude * 0.7 + qty_norm * 0.3 ; prefer directional gap sign if market bias same
-    df['score'] = df['abs_gap'] * 0.7 + df['qty_norm'] * 0.3
-    df = df.sort_values('score', ascending=False)
-    # select top_n
-    watch = df.head(top_n).to_dict('records')
+    score = abs_gap * 0.7 + qty_norm * 0.3
+    # select top_n without a full sort; rows with no score rank last
+    rank = np.where(np.isnan(score), -np.inf, score)
+    k = min(top_n, n)
+    if k <= 0:
+        return []
+    top = np.argpartition(-rank, k - 1)[:k]
+    top = top[np.argsort(-rank[top], kind='stable')]
+    # missing gaps go out as NaN so callers can compare gap_pct without a None check
+    watch = [dict(candidates[i], gap_pct=float(gap[i]), abs_gap=float(abs_gap[i]),
+                  qty_norm=float(qty_norm[i]), score=float(score[i]))
+             for i in top]
     return watch
 
 # ---------------------------
@@ -259,8 +292,7 @@ def run_scan():
     us = fetch_yf_symbols(US_SYMBOLS)
     asia = fetch_yf_symbols(ASIA_SYMBOLS)
     vix = fetch_india_vix()
-    gift = scrape_gift_nifty()
-    preopen = fetch_preopen_fo()
+    gift, preopen = asyncio.run(fetch_external())
 
     score, details = score_market(us, asia, gift, vix)
     bias = "BULLISH" if score > 1.0 else ("BEARISH" if score < -1.0 else "NEUTRAL")
@@ -0,0 +1,83 @@
+"""
+yf_cache.py
+
+On-disk cache for yfinance downloads.
+
+Daily bars don't change between runs on the same morning, so repeat runs of
+scanner.py / trend.py read the last download from .yf_cache/ instead of going
+back to Yahoo. Entries expire after CACHE_EXPIRE seconds.
+
+Yahoo throttles bursts, so downloads use at most MAX_CONNECTIONS threads and
+an empty batch result is retried with exponential backoff. Per-ticker
+follow-up fetches pass retries=0 so a throttled run doesn't multiply requests.
+"""
+
+import hashlib
+import os
+import time
+
+import pandas as pd
+import yfinance as yf
+
+CACHE_DIR = ".yf_cache"
+CACHE_EXPIRE = 3600  # seconds
+MAX_CONNECTIONS = 8  # concurrent requests to Yahoo
+RETRIES = 3
+BACKOFF = 0.3  # seconds, doubled on each retry
+
+
+def _cache_path(tickers, kwargs):
+    key = repr((sorted(tickers), sorted(kwargs.items())))
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".pkl")
+
+
+def download(tickers, retries=RETRIES, **kwargs):
+    """
+    yf.download(tickers, group_by='ticker', ...) with an on-disk cache.
+    Empty results and errors are retried up to `retries` times and never
+    cached; an empty ticker list returns an empty DataFrame without a request.
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return pd.DataFrame()
+    path = _cache_path(tickers, kwargs)
+    try:
+        if time.time() - os.path.getmtime(path) < CACHE_EXPIRE:
+            return pd.read_pickle(path)
+    except Exception:
+        pass
+
+    data = None
+    for attempt in range(retries + 1):
+        try:
+            data = yf.download(tickers, group_by='ticker', threads=MAX_CONNECTIONS, progress=False, **kwargs)
+        except Exception:
+            data = None
+        if data is not None and not data.empty:
+            break
+        if attempt < retries:
+            time.sleep(BACKOFF * 2 ** attempt)
+    if data is not None and not data.empty:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            data.to_pickle(path)
+        except Exception:
+            pass
+    return data
+
+
+def ticker_frame(data, ticker):
+    """
+    Slice one ticker's OHLCV frame out of a grouped download result.
+    Rows are dropped per ticker since symbols trade on different calendars.
+    """
+    if data is None or data.empty:
+        return None
+    if not isinstance(data.columns, pd.MultiIndex):
+        # Single ticker downloads may come back without the ticker level
+        return data.dropna()
+    # yf.download upper-cases symbols in its result columns
+    ticker = ticker.upper()
+    if ticker not in data.columns.get_level_values(0):
+        return None
+    return data[ticker].dropna()